@@ -1,35 +1,353 @@
+import os
 import sys
 import cv2
 import mediapipe as mp
+import numpy as np
 import pygame
 import random
 import math
 import time
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional => NumPy hit test below
+    njit = None
+
 from PyQt5.QtGui import (
-    QImage, QPixmap, QGuiApplication, QPainter, QPen, QColor
+    QImage, QPixmap, QGuiApplication, QPainter, QPen, QColor,
+    QOpenGLTexture, QOpenGLShader, QOpenGLShaderProgram,
+    QOpenGLVersionProfile, QOpenGLPixelTransferOptions
 )
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QPushButton, QStatusBar,
-    QComboBox, QSlider
+    QComboBox, QSlider, QOpenGLWidget
 )
 from PyQt5.QtCore import (
-    QTimer, QRect, Qt, QPoint
+    QTimer, QRect, Qt, QLineF, QPointF, QRectF, QObject, QThread, pyqtSignal
 )
 
+HAND_MODEL_PATH = "Assets/hand_landmarker.task"
+
+def monotonic_ms():
+    # animation + scoring clock => immune to system clock changes
+    return int(time.monotonic() * 1000)
+
+if njit is not None:
+    @njit(cache=True)
+    def hit_mask(rects, tips):
+        """
+        rects: (K,4) int32 left,right,top,bottom; tips: (F,2) int32 x,y.
+        Returns a (K,) uint8 mask of keys touched by any fingertip.
+        """
+        out = np.zeros(rects.shape[0], dtype=np.uint8)
+        for t in range(tips.shape[0]):
+            x = tips[t,0]
+            y = tips[t,1]
+            for k in range(rects.shape[0]):
+                if rects[k,0] <= x <= rects[k,1] and rects[k,2] <= y <= rects[k,3]:
+                    out[k] = 1
+        return out
+else:
+    def hit_mask(rects, tips):
+        """
+        rects: (K,4) int32 left,right,top,bottom; tips: (F,2) int32 x,y.
+        Returns a (K,) uint8 mask of keys touched by any fingertip.
+        """
+        x = tips[:,0:1]
+        y = tips[:,1:2]
+        inside = (rects[:,0] <= x) & (x <= rects[:,1]) & (rects[:,2] <= y) & (y <= rects[:,3])
+        return inside.any(axis=0).astype(np.uint8)
+
+class CaptureWorker(QObject):
+    """
+    Owns the camera + MediaPipe HandLandmarker and runs them on a worker QThread,
+    so capture/inference never blocks redraws or the tile/note animations.
+    Emits the hand landmarks with the display-sized frame.
+    """
+    frame_ready = pyqtSignal(object, QImage)
+    frames_dropped = pyqtSignal(int)
+
+    def __init__(self, out_w, out_h):
+        super().__init__()
+        self.out_w = out_w
+        self.out_h = out_h
+        self._running = False
+
+        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+        if not self.cap.isOpened():
+            print("Warning: Could not open camera.")
+        else:
+            # keep only the newest frame in the driver queue => less AR lag
+            if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                print("Warning: Camera buffer size not reduced.")
+            # MJPG keeps the DSHOW pipe from backing up at screen resolution
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH,out_w)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT,out_h)
+
+        # drain-to-latest: cap on grabs per frame so a fast camera can't starve us
+        self.max_drain_frames = 4
+        self.live_grab_s = 0.010
+        self._dropped_total = 0
+        self._dropped_report_t = 0.0  # monotonic time of the last frames_dropped emit
+
+        # run hand tracking on every skip_frames-th frame, reuse landmarks in between
+        self.skip_frames = 2
+        self._frame_idx = 0
+        self._last_landmarks = None
+        self._last_ts_ms = 0
+
+        # Tasks API in LIVE_STREAM mode => inference runs async, results arrive via callback
+        self.landmarker = None
+        if not os.path.exists(HAND_MODEL_PATH):
+            print(f"Warning: Could not load {HAND_MODEL_PATH}, hand tracking disabled.")
+        else:
+            vision = mp.tasks.vision
+            options = vision.HandLandmarkerOptions(
+                base_options=mp.tasks.BaseOptions(model_asset_path=HAND_MODEL_PATH),
+                running_mode=vision.RunningMode.LIVE_STREAM,
+                num_hands=2,
+                min_hand_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+                result_callback=self.on_landmarks
+            )
+            self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+        # native-resolution flip + RGB buffers for inference, (re)allocated only when
+        # the camera's frame size changes => no per-frame allocation
+        self._flip_buf = None
+        self._rgb_native = None
+
+        # two RGB buffers, each wrapped once by a persistent QImage (no per-frame copy):
+        # we fill one while the GUI may still be showing the other
+        self._rgb_bufs = [np.empty((out_h,out_w,3), dtype=np.uint8) for _ in range(2)]
+        self._qimgs = [
+            QImage(buf.data,out_w,out_h,out_w*3,QImage.Format_RGB888)
+            for buf in self._rgb_bufs
+        ]
+        self._buf_idx = 0
+        self._pending = None  # buffer index handed to the GUI and not yet consumed
+
+    def grab_latest_frame(self):
+        """
+        Drain frames queued while we were busy and retrieve only the newest.
+        A grab that blocks for a while means the queue was empty => that frame is live.
+        """
+        grabbed = 0
+        while grabbed < self.max_drain_frames:
+            t0 = time.perf_counter()
+            if not self.cap.grab():
+                break
+            grabbed += 1
+            if time.perf_counter() - t0 > self.live_grab_s:
+                break
+        if not grabbed:
+            return False, None
+
+        dropped = grabbed - 1
+        if dropped:
+            self._dropped_total += dropped
+            # surface the count at most once a second
+            now = time.monotonic()
+            if now - self._dropped_report_t >= 1.0:
+                self._dropped_report_t = now
+                self.frames_dropped.emit(self._dropped_total)
+        return self.cap.retrieve()
+
+    def run(self):
+        self._running = True
+        while self._running:
+            ret, frame = self.grab_latest_frame()
+            if not ret:
+                QThread.msleep(30)
+                continue
+
+            if self._flip_buf is None or self._flip_buf.shape != frame.shape:
+                self._flip_buf = np.empty_like(frame)
+                self._rgb_native = np.empty_like(frame)
+
+            # flip + RGB at native resolution => MediaPipe sees the undistorted camera frame
+            idx = self._buf_idx
+            display_buf = self._rgb_bufs[idx]
+            native_is_display = frame.shape[:2] == (self.out_h,self.out_w)
+            rgb_buf = display_buf if native_is_display else self._rgb_native
+            cv2.flip(frame, 1, dst=self._flip_buf)
+            cv2.cvtColor(self._flip_buf, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+
+            # no hand last time => always infer so palm re-detection stays prompt
+            self._frame_idx += 1
+            if self.landmarker is not None and (
+                    self._last_landmarks is None or self._frame_idx % self.skip_frames == 0):
+                # LIVE_STREAM needs strictly increasing timestamps
+                ts_ms = max(int(time.monotonic() * 1000), self._last_ts_ms + 1)
+                self._last_ts_ms = ts_ms
+                mp_img = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_buf)
+                self.landmarker.detect_async(mp_img, ts_ms)
+
+            # scale to the display size only for display (SIMD resize) => no Qt smooth scale later
+            if not native_is_display:
+                cv2.resize(rgb_buf, (self.out_w,self.out_h), dst=display_buf,
+                           interpolation=cv2.INTER_LINEAR)
+
+            # GUI still busy with the other buffer => skip display, refill this one next time
+            if self._pending is not None:
+                continue
+            self._pending = idx
+            self._buf_idx = 1 - idx
+            self.frame_ready.emit(self._last_landmarks, self._qimgs[idx])
+
+    def frame_consumed(self):
+        # called from the GUI thread once update_camera is done with the pending buffer
+        self._pending = None
+
+    def on_landmarks(self, result, output_image, timestamp_ms):
+        # called on MediaPipe's thread => just stash the newest result
+        self._last_landmarks = result.hand_landmarks or None
+
+    def stop(self):
+        self._running = False
+
+    def close(self):
+        if self.cap.isOpened():
+            self.cap.release()
+        if self.landmarker is not None:
+            self.landmarker.close()
+
+class GLFrameWidget(QOpenGLWidget):
+    """
+    Camera feed drawn through OpenGL: one texture sized to the display frame is
+    created once, each frame is uploaded into it (glTexSubImage2D via setData) and
+    drawn as a full-viewport triangle strip. The transparent overlays above are
+    composited on top by Qt.
+    """
+
+    VERTEX_SHADER = """
+        attribute highp vec2 vertex;
+        attribute mediump vec2 texCoord;
+        varying mediump vec2 texc;
+        void main(void)
+        {
+            gl_Position = vec4(vertex, 0.0, 1.0);
+            texc = texCoord;
+        }
+    """
+    FRAGMENT_SHADER = """
+        uniform sampler2D texture;
+        varying mediump vec2 texc;
+        void main(void)
+        {
+            gl_FragColor = texture2D(texture, texc);
+        }
+    """
+    # strip over the viewport; image row 0 is the top => t=0 at y=+1
+    QUAD_VERTICES = [(-1.0, -1.0), (1.0, -1.0), (-1.0, 1.0), (1.0, 1.0)]
+    QUAD_TEXCOORDS = [(0.0, 1.0), (1.0, 1.0), (0.0, 0.0), (1.0, 0.0)]
+
+    def __init__(self, parent, width, height):
+        super().__init__(parent)
+        self.setGeometry(0, 0, width, height)
+        self.tex_w = width
+        self.tex_h = height
+
+        self.gl = None
+        self._program = None
+        self._tex = None
+        self._has_frame = False
+
+        # RGB rows are w*3 bytes => not 4-byte aligned for every width
+        self._upload_opts = QOpenGLPixelTransferOptions()
+        self._upload_opts.setAlignment(1)
+
+    def initializeGL(self):
+        profile = QOpenGLVersionProfile()
+        profile.setVersion(2, 0)
+        self.gl = self.context().versionFunctions(profile)
+        self.gl.initializeOpenGLFunctions()
+
+        self._program = QOpenGLShaderProgram(self)
+        self._program.addShaderFromSourceCode(QOpenGLShader.Vertex, self.VERTEX_SHADER)
+        self._program.addShaderFromSourceCode(QOpenGLShader.Fragment, self.FRAGMENT_SHADER)
+        self._program.bindAttributeLocation("vertex", 0)
+        self._program.bindAttributeLocation("texCoord", 1)
+        self._program.link()
+
+        # storage allocated once; frames only replace its contents
+        self._tex = QOpenGLTexture(QOpenGLTexture.Target2D)
+        self._tex.setFormat(QOpenGLTexture.RGB8_UNorm)
+        self._tex.setSize(self.tex_w, self.tex_h)
+        self._tex.setMinMagFilters(QOpenGLTexture.Linear, QOpenGLTexture.Linear)
+        self._tex.setWrapMode(QOpenGLTexture.ClampToEdge)
+        self._tex.allocateStorage(QOpenGLTexture.RGB, QOpenGLTexture.UInt8)
+
+        self.context().aboutToBeDestroyed.connect(self.cleanupGL)
+
+    def cleanupGL(self):
+        self.makeCurrent()
+        self._tex.destroy()
+        self._tex = None
+        self._program = None
+        self.doneCurrent()
+
+    def set_frame(self, qt_img):
+        """
+        Upload a display-sized RGB888 frame into the texture. The pixels are copied
+        to the GPU here, so the caller's buffer may be reused as soon as this returns.
+        """
+        if self._tex is None:
+            return
+        self.makeCurrent()
+        self._tex.setData(QOpenGLTexture.RGB, QOpenGLTexture.UInt8, qt_img.constBits(), self._upload_opts)
+        self.doneCurrent()
+        self._has_frame = True
+        self.update()
+
+    def paintGL(self):
+        gl = self.gl
+        gl.glClearColor(0.0, 0.0, 0.0, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        if not self._has_frame:
+            return
+
+        self._program.bind()
+        self._tex.bind(0)
+        self._program.setUniformValue("texture", 0)
+        self._program.enableAttributeArray(0)
+        self._program.enableAttributeArray(1)
+        self._program.setAttributeArray(0, self.QUAD_VERTICES)
+        self._program.setAttributeArray(1, self.QUAD_TEXCOORDS)
+        gl.glDrawArrays(gl.GL_TRIANGLE_STRIP, 0, 4)
+        self._program.disableAttributeArray(0)
+        self._program.disableAttributeArray(1)
+        self._tex.release()
+        self._program.release()
+
 class SkeletonOverlay(QLabel):
     """
     A transparent overlay widget that draws the hand skeleton on top of everything (piano + camera).
     """
+    # whole landmark dot pixmap, the source rect of every dot fragment
+    DOT_SOURCE = QRectF(0, 0, 7, 7)
+
     def __init__(self, parent, width, height):
         super().__init__(parent)
         self.setGeometry(0, 0, width, height)
         self.setStyleSheet("background: transparent;")
         self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
 
+        # ready-to-draw: list of QLineF + list of dot PixmapFragments
         self.skeleton_data = []
         self.points_data = []
 
+        # red landmark dot rendered once, blitted at every landmark
+        self._dot = QPixmap(7, 7)
+        self._dot.fill(Qt.transparent)
+        p = QPainter(self._dot)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setBrush(QColor(255, 0, 0, 200))
+        p.setPen(Qt.NoPen)
+        p.drawEllipse(0, 0, 6, 6)
+        p.end()
+
     def paintEvent(self, event):
         super().paintEvent(event)
         painter = QPainter(self)
@@ -38,21 +356,17 @@ class SkeletonOverlay(QLabel):
         # Skeleton lines in white
         pen_line = QPen(QColor(255, 255, 255, 200), 3)
         painter.setPen(pen_line)
-        for line in self.skeleton_data:
-            (x1, y1), (x2, y2) = line
-            painter.drawLine(QPoint(x1, y1), QPoint(x2, y2))
+        painter.drawLines(self.skeleton_data)
 
         # Landmarks in red
-        pen_points = QPen(QColor(255, 0, 0, 200), 6)
-        painter.setPen(pen_points)
-        for (px, py) in self.points_data:
-            painter.drawPoint(QPoint(px, py))
+        painter.drawPixmapFragments(self.points_data, self._dot)
 
 class FlyingNote(QLabel):
     """
     Displays a random note image that moves for ~1 second, then self-destructs.
+    Animated by the piano's shared tick.
     """
-    def __init__(self, parent, pixmap, start_x, start_y):
+    def __init__(self, parent, piano, pixmap, start_x, start_y):
         super().__init__(parent)
         self.setStyleSheet("background: transparent;")
         self.setPixmap(pixmap)
@@ -61,26 +375,32 @@ class FlyingNote(QLabel):
 
         self.lifetime_ms = 1000
         self.elapsed_ms = 0
+        self.last_ms = None
+        self.is_finished = False
 
+        # velocity in px per nominal frame
         angle = random.uniform(0, 2*math.pi)
         speed = random.uniform(1.0, 3.0)
         self.vx = speed*math.cos(angle)
         self.vy = speed*math.sin(angle)
+        self.pos_x = float(start_x)
+        self.pos_y = float(start_y)
+
+        piano._animated.append(self)
 
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_position)
-        self.update_timer.start(33)
+    def tick(self, now_ms):
+        dt = ARPiano.FRAME_MS if self.last_ms is None else min(now_ms - self.last_ms, ARPiano.MAX_TICK_MS)
+        self.last_ms = now_ms
 
-    def update_position(self):
-        self.elapsed_ms += 33
+        self.elapsed_ms += dt
         if self.elapsed_ms >= self.lifetime_ms:
-            self.update_timer.stop()
-            self.deleteLater()
+            self.is_finished = True
             return
 
-        nx = self.x() + self.vx
-        ny = self.y() + self.vy
-        self.move(int(nx), int(ny))
+        steps = dt / ARPiano.FRAME_MS
+        self.pos_x += self.vx*steps
+        self.pos_y += self.vy*steps
+        self.move(int(self.pos_x), int(self.pos_y))
 
 class EffectOverlay(QLabel):
     """
@@ -98,6 +418,9 @@ class FallingTile(QLabel):
     White note => tile is BLUE, Black note => tile is PINK.
     If Teach OFF => collisions-based scoring (no sound on collision).
     """
+    # (tile_side, is_black) => pre-rendered tile, shared by every tile of that size/colour
+    _pixmap_cache = {}
+
     def __init__(self, parent, piano, note_name, key_rect, fall_speed, x_offset=0):
         super().__init__(parent)
         self.piano = piano
@@ -112,38 +435,58 @@ class FallingTile(QLabel):
         start_x = key_rect.x() + x_offset + (key_rect.width() - tile_side)//2
         start_y = -tile_side
         self.move(start_x, start_y)
+        self.pos_y = float(start_y)
+        self.last_ms = None
+
+        # Content never changes, only position => render once, reuse the pixmap
+        is_black = note_name in piano.blackNoteNames
+        key = (tile_side, is_black)
+        if key not in self._pixmap_cache:
+            self._pixmap_cache[key] = self.render_tile(tile_side, is_black)
+        self.setPixmap(self._pixmap_cache[key])
+
+        # margin for "close"
+        self.margin_close = 50
+        self.show()
 
+        piano._animated.append(self)
+
+    @staticmethod
+    def render_tile(tile_side, is_black):
         # Color the tile based on if note_name is white or black
-        if note_name in piano.blackNoteNames:
+        if is_black:
             # pink
-            self.fill_color = QColor(255, 105, 180, 180)  # hotpink-ish
+            fill_color = QColor(255, 105, 180, 180)  # hotpink-ish
         else:
             # blue
-            self.fill_color = QColor(0, 128, 255, 180)
+            fill_color = QColor(0, 128, 255, 180)
 
-        self.border_color = QColor(0, 0, 0, 220)
-        self.border_width = 3
+        border_color = QColor(0, 0, 0, 220)
+        border_width = 3
 
-        # margin for "close"
-        self.margin_close = 50
-        self.show()
-
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        painter = QPainter(self)
+        pix = QPixmap(tile_side, tile_side)
+        pix.fill(Qt.transparent)
+        painter = QPainter(pix)
         painter.setRenderHint(QPainter.Antialiasing)
 
-        pen = QPen(self.border_color, self.border_width)
+        pen = QPen(border_color, border_width)
         painter.setPen(pen)
-        painter.setBrush(self.fill_color)
-        painter.drawRect(self.rect())
+        painter.setBrush(fill_color)
+        painter.drawRect(pix.rect())
+        painter.end()
+        return pix
 
-    def update_position(self):
+    def tick(self, now_ms):
         if self.is_finished:
             return
 
+        # fall_speed is px per nominal frame => scale by real elapsed time
+        dt = ARPiano.FRAME_MS if self.last_ms is None else min(now_ms - self.last_ms, ARPiano.MAX_TICK_MS)
+        self.last_ms = now_ms
+        self.pos_y += self.fall_speed * dt / ARPiano.FRAME_MS
+
         nx = self.x()
-        ny = self.y() + self.fall_speed
+        ny = int(self.pos_y)
         self.move(nx, ny)
 
         tile_bottom = ny + self.height()
@@ -154,7 +497,6 @@ class FallingTile(QLabel):
             # Modified to handle list of collisions
             if not any(c['note_name'] == self.note_name for c in self.piano.collisions):
                 if tile_bottom >= key_top - self.margin_close:
-                    now_ms = int(time.time() * 1000)
                     self.piano.collisions.append({'note_name': self.note_name, 'ctime': now_ms})
 
         # If tile hits the key
@@ -177,32 +519,19 @@ class TileOverlay(QLabel):
         self.piano = piano
         self.tiles = []
 
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_tiles)
-        self.update_timer.start(33)
-
     def spawnTile(self, note_name, fall_speed=4):
-        active_count = sum(1 for t in self.tiles if t.note_name == note_name and not t.is_finished)
+        # tiles are moved/deleted by the piano's shared tick => just forget finished ones
+        self.tiles = [t for t in self.tiles if not t.is_finished]
+        active_count = sum(1 for t in self.tiles if t.note_name == note_name)
         x_offset = active_count * 20
 
-        key_rect = None
-        for (btn, nm) in self.piano.keys_info:
-            if nm == note_name:
-                key_rect = btn.geometry()
-                break
-        if not key_rect:
+        key_rect = self.piano.key_geom_by_name.get(note_name)
+        if key_rect is None:
             return
 
         tile = FallingTile(self, self.piano, note_name, key_rect, fall_speed, x_offset)
         self.tiles.append(tile)
 
-    def update_tiles(self):
-        for t in self.tiles[:]:
-            t.update_position()
-            if t.is_finished:
-                self.tiles.remove(t)
-                t.deleteLater()
-
 class ARPiano(QMainWindow):
     """
     AR Piano with:
@@ -225,6 +554,31 @@ class ARPiano(QMainWindow):
     FINGER_TIPS = [8,12,16,20]
     FINGER_PIPS = [6,10,14,18]
 
+    # animation tick period (~30fps); a stalled tick advances at most 4 frames
+    FRAME_MS = 33
+    MAX_TICK_MS = 4*FRAME_MS
+
+    # melodies as (note, ms since previous note), built once at class definition
+    HAPPY_BIRTHDAY = (
+        ('g40',0),('g40',800),('a4',800),('g40',800),('c5',800),('b4',1000),
+        ('g40',800),('g40',800),('a4',800),('g40',800),('d5',800),('c5',1000),
+        ('g4',800),('g4',800),('g5',800),('e5',800),('c5',800),('b4',800),('a4',1200),
+        ('f5',800),('f5',800),('e5',800),('c5',800),('d5',800),('c5',1000)
+    )
+    INTERSTELLAR = (
+        ('a4', 800), ('e5', 800), ('a4', 800), ('e5', 800),
+        ('b4', 800), ('e5', 800), ('b4', 800), ('e5', 800),
+
+        ('c5', 800), ('e5', 800), ('c5', 800), ('e5', 800),
+        ('d5', 800), ('e5', 800), ('d5', 800), ('e5', 800),
+
+        ('a4', 800), ('e5', 800), ('a4', 800), ('e5', 800),
+        ('b4', 800), ('e5', 800), ('b4', 800), ('e5', 800),
+
+        ('c5', 800), ('e5', 800), ('c5', 800), ('e5', 800),
+        ('d5', 800), ('e5', 800), ('d5', 800), ('e5', 800),
+    )
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AR Piano Teaching Machine")
@@ -251,16 +605,10 @@ class ARPiano(QMainWindow):
         self.screen_h = rect.height()
         self.setGeometry(0,0,self.screen_w,self.screen_h)
 
-        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        if not self.cap.isOpened():
-            print("Warning: Could not open camera.")
-        else:
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH,self.screen_w)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT,self.screen_h)
+        # camera + hand tracking live on a worker thread
+        self.capture_worker = CaptureWorker(self.screen_w,self.screen_h)
 
-        self.camera_label = QLabel(self)
-        self.camera_label.setGeometry(0,0,self.screen_w,self.screen_h)
-        self.camera_label.setStyleSheet("background-color:black;")
+        self.camera_label = GLFrameWidget(self,self.screen_w,self.screen_h)
 
         self.keys_info = []
         self.load_sounds()
@@ -269,21 +617,18 @@ class ARPiano(QMainWindow):
         # Create keys
         self.create_white_keys()
         self.create_black_keys()
+        self.build_key_lookup()
 
         self.setStatusBar(QStatusBar(self))
 
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        self.HAND_CONNECTIONS = mp.tasks.vision.HandLandmarksConnections.HAND_CONNECTIONS
+        # (E,2) landmark index pairs => pts[HAND_EDGES] gives every skeleton line at once
+        self.HAND_EDGES = np.array(
+            [(c.start, c.end) for c in self.HAND_CONNECTIONS], dtype=np.intp
         )
-        self.HAND_CONNECTIONS = self.mp_hands.HAND_CONNECTIONS
 
-        self.is_held = {}
-        for (_, nm) in self.keys_info:
-            self.is_held[nm] = False
+        # held flag per key, indexed like keys_info
+        self.is_held = np.zeros(len(self.keys_info), dtype=np.bool_)
 
         # overlays
         self.skeleton_overlay = SkeletonOverlay(self,self.screen_w,self.screen_h)
@@ -297,10 +642,19 @@ class ARPiano(QMainWindow):
         self.tile_overlay.raise_()
         self.tile_overlay.show()
 
-        # camera update
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_camera)
-        self.timer.start(30)
+        # one shared timer animates every FallingTile + FlyingNote
+        self._animated = []
+        self.anim_timer = QTimer()
+        self.anim_timer.timeout.connect(self.tick_animations)
+        self.anim_timer.start(self.FRAME_MS)
+
+        # camera update => driven by the worker's frames, drawn on the GUI thread
+        self.capture_thread = QThread(self)
+        self.capture_worker.moveToThread(self.capture_thread)
+        self.capture_thread.started.connect(self.capture_worker.run)
+        self.capture_worker.frame_ready.connect(self.update_camera)
+        self.capture_worker.frames_dropped.connect(self.onFramesDropped)
+        self.capture_thread.start()
 
         # toggles
         self.auto_play_muted = False  # Teach ON => normal auto-play
@@ -349,6 +703,13 @@ class ARPiano(QMainWindow):
             else:
                 print(f"Warning: Could not load {path}")
 
+        # pre-scale every note at a few sizes in 0.5..1.2 => spawning is just a pick
+        scales = [0.5 + 0.7*i/5 for i in range(6)]
+        self.notePixmaps_scaled = [
+            pix.scaled(int(pix.width()*f), int(pix.height()*f), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            for pix in self.notePixmaps for f in scales
+        ]
+
     def create_white_keys(self):
         white_keys = [
             ("c4","Q"), ("d4","W"), ("e4","E"), ("f4","R"),
@@ -427,6 +788,28 @@ class ARPiano(QMainWindow):
 
             self.keyStyles[note_name] = base_black_style
 
+    def build_key_lookup(self):
+        """
+        Name => button/geometry dicts for spawning tiles and flying notes.
+        Struct-of-arrays view of keys_info (index k = k-th key) for the per-frame
+        path: names, buttons and a (K,4) int32 rect array for hit_mask, so the
+        fingertip test makes no geometry() calls.
+        Call again if the keys are ever moved.
+        """
+        self.btn_by_name = {nm: btn for (btn, nm) in self.keys_info}
+        self.key_geom_by_name = {nm: btn.geometry() for (btn, nm) in self.keys_info}
+
+        self._names = [nm for (_, nm) in self.keys_info]
+        self._buttons = [btn for (btn, _) in self.keys_info]
+
+        self._rects_np = np.array(
+            [[r.left(), r.right(), r.top(), r.bottom()]
+             for r in (btn.geometry() for (btn, _) in self.keys_info)],
+            dtype=np.int32
+        )
+        # compile hit_mask now (Numba JITs on first call) => no stall on the first key press
+        hit_mask(self._rects_np, np.zeros((1,2), dtype=np.int32))
+
     def createTeachToggleButton(self):
         """
         Teach Toggle:
@@ -580,30 +963,9 @@ class ARPiano(QMainWindow):
     def onPlayMusicClicked(self):
         s = self.musicBox.currentText()
         if "Happy Birthday" in s:
-            melody = [
-                ('g40',0),('g40',800),('a4',800),('g40',800),('c5',800),('b4',1000),
-                ('g40',800),('g40',800),('a4',800),('g40',800),('d5',800),('c5',1000),
-                ('g4',800),('g4',800),('g5',800),('e5',800),('c5',800),('b4',800),('a4',1200),
-                ('f5',800),('f5',800),('e5',800),('c5',800),('d5',800),('c5',1000)
-            ]
-            self.playMelodyIteratively(melody)
+            self.playMelodyIteratively(self.HAPPY_BIRTHDAY)
         elif "Interstellar" in s:
-            melody = [
-                ('a4', 800), ('e5', 800), ('a4', 800), ('e5', 800),
-                ('b4', 800), ('e5', 800), ('b4', 800), ('e5', 800),
-
-                ('c5', 800), ('e5', 800), ('c5', 800), ('e5', 800),
-                ('d5', 800), ('e5', 800), ('d5', 800), ('e5', 800),
-
-                ('a4', 800), ('e5', 800), ('a4', 800), ('e5', 800),
-                ('b4', 800), ('e5', 800), ('b4', 800), ('e5', 800),
-
-                ('c5', 800), ('e5', 800), ('c5', 800), ('e5', 800),
-                ('d5', 800), ('e5', 800), ('d5', 800), ('e5', 800),
-            ]
-
-            self.playMelodyIteratively(melody)
-
+            self.playMelodyIteratively(self.INTERSTELLAR)
 
     def playMelodyIteratively(self, melody):
         """
@@ -635,7 +997,7 @@ class ARPiano(QMainWindow):
         Handles playing sounds and scoring logic based on teach mode.
         """
 
-        current_ms = int(time.time() * 1000)
+        current_ms = monotonic_ms()
 
         # 1) If the note is triggered by a falling tile and Teach is ON
         if from_tile and not self.auto_play_muted:
@@ -679,11 +1041,9 @@ class ARPiano(QMainWindow):
             return
 
     def spawnFlyingNoteOnKey(self, note_name):
-        # find button
-        for (btn, nm) in self.keys_info:
-            if nm == note_name:
-                self.spawnFlyingNote(btn)
-                break
+        btn = self.btn_by_name.get(note_name)
+        if btn is not None:
+            self.spawnFlyingNote(btn)
 
     def addScore(self, points):
         self.score += points
@@ -692,13 +1052,11 @@ class ARPiano(QMainWindow):
         self.scoreLabel.setText(f"Score: {self.score}")
 
     def spawnFlyingNote(self, btn):
-        if not self.notePixmaps:
+        if not self.notePixmaps_scaled:
             return
-        pix_original = random.choice(self.notePixmaps)
-        sf = random.uniform(0.5,1.2)
-        sw = int(pix_original.width()*sf)
-        sh = int(pix_original.height()*sf)
-        pix_scaled = pix_original.scaled(sw, sh, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pix_scaled = random.choice(self.notePixmaps_scaled)
+        sw = pix_scaled.width()
+        sh = pix_scaled.height()
 
         r = btn.geometry()
         cx = r.x() + r.width()//2
@@ -708,71 +1066,87 @@ class ARPiano(QMainWindow):
         sx = cx+offx - sw//2
         sy = cy+offy - sh//2
 
-        note_label = FlyingNote(self.effects_overlay, pix_scaled, sx, sy)
+        note_label = FlyingNote(self.effects_overlay, self, pix_scaled, sx, sy)
         self.effects_overlay.raise_()
 
-    def update_camera(self):
-        # Capture
-        ret, frame = self.cap.read()
-        if not ret:
-            return
+    def tick_animations(self):
+        now_ms = monotonic_ms()
+        # rebuild the list instead of copy + remove() => O(N_active) per tick
+        keep = []
+        for obj in self._animated:
+            obj.tick(now_ms)
+            if obj.is_finished:
+                obj.deleteLater()
+            else:
+                keep.append(obj)
+        self._animated = keep
 
-        frame = cv2.flip(frame,1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h,w,_ = frame_rgb.shape
+    def onFramesDropped(self, total):
+        self.statusBar().showMessage(f"Dropped stale frames: {total}", 2000)
 
-        results = self.hands.process(frame_rgb)
+    def update_camera(self, hand_landmarks_list, qt_img):
+        """
+        GUI-thread slot for CaptureWorker.frame_ready: skeleton, key touches, camera feed.
+        """
+        # landmarks are normalized => map onto the display-sized frame
+        w,h = qt_img.width(),qt_img.height()
+
+        scale = np.array([w,h], dtype=np.float32)
+        hands_pts = []
+        extended_tips = []
+        touched_now = np.zeros(len(self._names), dtype=np.bool_)
+
+        if hand_landmarks_list:
+            for hand_landmarks in hand_landmarks_list:
+                arr = np.fromiter(
+                    (c for lm in hand_landmarks for c in (lm.x, lm.y)),
+                    dtype=np.float32, count=42
+                ).reshape(21,2)
+                pts = (arr*scale).astype(np.int32)
+                hands_pts.append(pts)
 
+                # check fingertip extended
+                tips = pts[self.FINGER_TIPS]
+                pips = pts[self.FINGER_PIPS]
+                extended_tips.append(tips[tips[:,1] < pips[:,1]])
+
+        # fingertips extended => one hit test against every key rect
+        if extended_tips:
+            touched_now = hit_mask(self._rects_np, np.concatenate(extended_tips)).astype(np.bool_)
+
+        # skeleton => one fancy-index over all hands, handed over as Qt batches
         all_lines = []
         all_points = []
-        touched_now = set()
-
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                pts = []
-                for lm in hand_landmarks.landmark:
-                    px=int(lm.x*w)
-                    py=int(lm.y*h)
-                    pts.append((px,py))
-
-                # skeleton
-                for (start_idx,end_idx) in self.HAND_CONNECTIONS:
-                    sx,sy=pts[start_idx]
-                    ex,ey=pts[end_idx]
-                    all_lines.append([(sx,sy),(ex,ey)])
-                all_points.extend(pts)
+        if hands_pts:
+            hands_np = np.stack(hands_pts)
+            all_lines = [
+                QLineF(x1,y1,x2,y2)
+                for x1,y1,x2,y2 in hands_np[:, self.HAND_EDGES].reshape(-1,4).tolist()
+            ]
+            # fragments are centred on pos => dot centre (3.5, 3.5) lands on the landmark pixel
+            dot_src = SkeletonOverlay.DOT_SOURCE
+            all_points = [
+                QPainter.PixmapFragment.create(QPointF(x+0.5,y+0.5), dot_src)
+                for x,y in hands_np.reshape(-1,2).tolist()
+            ]
 
-                # check fingertip extended
-                for tip_idx,pip_idx in zip(self.FINGER_TIPS,self.FINGER_PIPS):
-                    tip_x,tip_y=pts[tip_idx]
-                    pip_x,pip_y=pts[pip_idx]
-                    if tip_y < pip_y:
-                        # fingertip extended => see if on a key
-                        for (btn,nm) in self.keys_info:
-                            r=btn.geometry()
-                            if (r.left()<=tip_x<=r.right() and
-                                r.top()<=tip_y<=r.bottom()):
-                                touched_now.add(nm)
-
-        # highlight pressed keys in YELLOW, revert others
-        for (btn,nm) in self.keys_info:
-            if nm in touched_now:
-                if not self.is_held[nm]:
-                    # trigger note
-                    self.trigger_note_by_name(nm)
-                    self.is_held[nm]=True
-                # set style => pressed
-                btn.setStyleSheet("background-color: yellow; border: 2px solid black; font-weight: bold;")
-            else:
-                if self.is_held[nm]:
-                    # key was released
-                    self.is_held[nm]=False
-                # revert style to original
-                btn.setStyleSheet(self.keyStyles[nm])
+        # highlight pressed keys in YELLOW, revert released ones
+        # (style only changes on press/release => no stylesheet re-parse every frame)
+        names = self._names
+        buttons = self._buttons
+        is_held = self.is_held
+        for k in np.flatnonzero(touched_now & ~is_held).tolist():
+            # trigger note, set style => pressed
+            self.trigger_note_by_name(names[k])
+            buttons[k].setStyleSheet("background-color: yellow; border: 2px solid black; font-weight: bold;")
+        for k in np.flatnonzero(is_held & ~touched_now).tolist():
+            # key was released => revert style to original
+            buttons[k].setStyleSheet(self.keyStyles[names[k]])
+        is_held[:] = touched_now
 
         # Handle missed notes
         if self.auto_play_muted:
-            current_ms=int(time.time()*1000)
+            current_ms=monotonic_ms()
             to_remove = []
             for collision in self.collisions:
                 if current_ms - collision['ctime'] > self.tile_score_window_ms:
@@ -785,22 +1159,16 @@ class ARPiano(QMainWindow):
         self.skeleton_overlay.points_data = all_points
         self.skeleton_overlay.update()
 
-        # show camera
-        frame_bgr=cv2.cvtColor(frame_rgb,cv2.COLOR_RGB2BGR)
-        qt_img=QImage(frame_bgr.data,w,h,w*3,QImage.Format_BGR888)
-        pixmap=QPixmap.fromImage(qt_img)
-        pixmap=pixmap.scaled(
-            self.camera_label.width(),
-            self.camera_label.height(),
-            Qt.IgnoreAspectRatio,
-            Qt.SmoothTransformation
-        )
-        self.camera_label.setPixmap(pixmap)
+        # show camera (already display-sized by the worker). set_frame copies the pixels
+        # into the GL texture => hand the buffer back right away, painted or not
+        self.camera_label.set_frame(qt_img)
+        self.capture_worker.frame_consumed()
 
     def closeEvent(self, event):
-        if self.cap.isOpened():
-            self.cap.release()
-        self.hands.close()
+        self.capture_worker.stop()
+        self.capture_thread.quit()
+        self.capture_thread.wait()
+        self.capture_worker.close()
         pygame.quit()
         super().closeEvent(event)
 